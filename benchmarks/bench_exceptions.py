@@ -0,0 +1,122 @@
+"""
+MICROBENCHMARK - cost of ONE failed /predictdata request (unknown category)
+Run from PROJECT ROOT after training (needs artifacts/model.pkl + preprocessor.pkl):
+    python -m benchmarks.bench_exceptions
+
+Both paths use the real modules and the real file logger (logs/):
+legacy         : old handler - DataFrame → load both pickles → OneHotEncoder raises
+                 → eager CustomException wrap → unhandled, logged with traceback
+                 (what uvicorn does for an exception the app doesn't handle)
+current form   : src/app.py - CustomData → cached schema validate_record → log_error
+current predict: same failure through PredictPipeline.predict / predict_batch
+
+Isolated wrap cost - identical raise site (category lookup KeyError) and
+identical logging (log_error), only the exception construction differs:
+wrap eager     : error_message_detail() runs in __init__ (the old CustomException)
+wrap lazy      : current CustomException, string only built if someone reads it
+"""
+import os
+import sys
+import pickle
+import timeit
+
+from src.app import log_error, predict_pipeline
+from src.exception import CustomException, InvalidInputError, error_message_detail
+from src.logger import logging
+from src.pipeline.predict_pipeline import CustomData
+
+N = 1_000
+server_logger = logging.getLogger("uvicorn.error")
+
+
+class LegacyException(Exception):
+    """CustomException as it was: eager sys.exc_info() walk + string format"""
+    def __init__(self, error_message, error_detail):
+        super().__init__(error_message)
+        self.error_message = error_message_detail(error_message, error_detail=error_detail)
+
+    def __str__(self):
+        return self.error_message
+
+
+class EagerInvalidInputError(InvalidInputError):
+    """Same type / code as InvalidInputError, but formats the location eagerly"""
+    def __init__(self, error_message, error_detail=sys):
+        super().__init__(error_message, error_detail)
+        self._error_message = error_message_detail(self.message, error_detail=error_detail)
+
+
+def legacy_load_object(file_path):
+    try:
+        with open(file_path, "rb") as file_obj:
+            return pickle.load(file_obj)
+    except Exception as e:
+        raise LegacyException(e, sys)
+
+
+def invalid_data():
+    return CustomData(
+        gender="robot",
+        race_ethnicity="group B",
+        parental_level_of_education="high school",
+        lunch="standard",
+        test_preparation_course="none",
+        reading_score=70.0,
+        writing_score=72.0,
+    )
+
+
+def legacy_request():
+    try:
+        input_df = invalid_data().get_data_as_data_frame()
+        try:
+            model = legacy_load_object(os.path.join("artifacts", "model.pkl"))
+            preprocessor = legacy_load_object(os.path.join("artifacts", "preprocessor.pkl"))
+            model.predict(preprocessor.transform(input_df))
+        except Exception as e:
+            raise LegacyException(e, sys)
+    except Exception:
+        server_logger.error("Exception in ASGI application", exc_info=True)
+
+
+def current_form_request():
+    data = invalid_data()
+    try:
+        predict_pipeline.get_schema().validate_record(data.get_data_as_dict())
+    except CustomException as exc:
+        log_error(exc)
+
+
+def current_predict_request():
+    try:
+        predict_pipeline.predict(invalid_data().get_data_as_data_frame())
+    except CustomException as exc:
+        log_error(exc)
+
+
+def wrapped_lookup(exc_type, lookup, value):
+    try:
+        return lookup[value]
+    except KeyError as e:
+        raise exc_type(e, sys)
+
+
+def isolated_request(exc_type, lookup):
+    try:
+        wrapped_lookup(exc_type, lookup, "robot")
+    except CustomException as exc:
+        log_error(exc)
+
+
+if __name__ == "__main__":
+    current_form_request()  # warm the schema cache, like the first request after startup
+    gender_lookup = predict_pipeline.get_schema().lookup["gender"]
+    for name, fn in [
+        ("legacy", legacy_request),
+        ("current form", current_form_request),
+        ("current predict", current_predict_request),
+        ("wrap eager", lambda: isolated_request(EagerInvalidInputError, gender_lookup)),
+        ("wrap lazy", lambda: isolated_request(InvalidInputError, gender_lookup)),
+    ]:
+        seconds = min(timeit.repeat(fn, number=N, repeat=3))
+        print(f"{name:16s} {seconds / N * 1e6:10.1f} us per failed request")
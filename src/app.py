@@ -2,15 +2,72 @@ from fastapi import FastAPI, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from src.exception import (
+    CustomException,
+    InvalidInputError,
+    ArtifactError,
+    ArtifactIntegrityError,
+    PredictionError,
+)
+from src.logger import logging
 from src.pipeline.predict_pipeline import CustomData, PredictPipeline
 
 # -------------------- APP SETUP --------------------
 
 app = FastAPI()
+logger = logging.getLogger(__name__)
 
 # Tell FastAPI where HTML templates are stored
 templates = Jinja2Templates(directory="templates")
 
+# One pipeline for the whole app: schema + model are loaded on first use and
+# reloaded only when their artifact files are replaced (e.g. after a retrain)
+predict_pipeline = PredictPipeline()
+
+# Error code → HTTP status (anything unlisted is a 500)
+ERROR_STATUS_CODES = {
+    InvalidInputError.code: 422,
+    ArtifactError.code: 503,
+    ArtifactIntegrityError.code: 503,
+    PredictionError.code: 500,
+}
+
+# Shown on the form for server-side failures - details only go to the log
+GENERIC_ERROR_MESSAGE = "Prediction service is unavailable right now, please try again later."
+
+
+# -------------------- ERROR HANDLING --------------------
+
+def log_error(exc: CustomException) -> int:
+    """
+    Log one failed request and return its HTTP status.
+    Client errors (4xx) are logged as one line without building the traceback string,
+    server errors (5xx) with the full traceback.
+    """
+    status_code = ERROR_STATUS_CODES.get(exc.code, 500)
+    if status_code < 500:
+        logger.warning("%s: %s", exc.code, exc.message)
+    else:
+        logger.error("%s: %s", exc.code, exc, exc_info=exc)
+    return status_code
+
+
+@app.exception_handler(CustomException)
+async def custom_exception_handler(request: Request, exc: CustomException):
+    """
+    Render the form again with the error message.
+    Only client errors (bad input) show their text; server errors show a generic
+    message so paths / internals never reach the page.
+    """
+    status_code = log_error(exc)
+    message = exc.message if status_code < 500 else GENERIC_ERROR_MESSAGE
+
+    return templates.TemplateResponse(
+        "home.html",
+        {"request": request, "error": message, "error_code": exc.code},
+        status_code=status_code,
+    )
+
 
 # -------------------- HOME PAGE (REDIRECT) --------------------
 
@@ -63,14 +120,17 @@ async def predict(
         writing_score=reading_score,
     )
 
-    # 2. Convert data to DataFrame
+    # 2. Validate against the fitted preprocessor's schema BEFORE any inference work
+    #    (invalid input raises SchemaValidationError → 422 via the handler above)
+    predict_pipeline.get_schema().validate_record(data.get_data_as_dict())
+
+    # 3. Convert data to DataFrame
     input_df = data.get_data_as_data_frame()
 
-    # 3. Make prediction
-    model = PredictPipeline()
-    prediction = model.predict(input_df)
+    # 4. Make prediction
+    prediction = predict_pipeline.predict(input_df)
 
-    # 4. Show result on the same page
+    # 5. Show result on the same page
     return templates.TemplateResponse(
         "home.html",
         {
@@ -6,8 +6,10 @@ Run from PROJECT ROOT after pip install -e .
 
 import sys
 import os
+import argparse
 from src.logger import logging  
 from src.exception import CustomException  
+from src.utils import save_dataframe, wait_for_pending_writes
 import pandas as pd
 from sklearn.model_selection import train_test_split 
 from dataclasses import dataclass  #  Data class (immutable config)
@@ -46,9 +48,12 @@ class DataIngestion:
                 df, test_size=0.2, random_state=42 
             )
             
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            # Atomic writes: readers never see a half-written CSV.
+            # Raw copy goes to the background writer - nothing downstream reads it
+            save_dataframe(self.ingestion_config.raw_data_path, df, background=True)
+            save_dataframe(self.ingestion_config.train_data_path, train_set)
+            save_dataframe(self.ingestion_config.test_data_path, test_set)
+            wait_for_pending_writes()
             
             self.logger.info("Ingestion completed successfully")
             
@@ -64,6 +69,13 @@ class DataIngestion:
 
 if __name__ == "__main__":  # Run only if direct execution (not import)
     """Entry point - creates DataIngestion instance + runs pipeline"""
+    parser = argparse.ArgumentParser(description="Run ingestion → transformation → training")
+    parser.add_argument(
+        "--max-p99-latency-ms", type=float, default=None,
+        help="Only select models whose single-row p99 predict latency is under this limit",
+    )
+    args = parser.parse_args()
+
     obj = DataIngestion()
     train_data, test_data = obj.initiate_data_ingestion()
     print(f"Train saved: {train_data}")
@@ -72,7 +84,7 @@ if __name__ == "__main__":  # Run only if direct execution (not import)
     
     obj2 = DataTransformation()
     train_arr,test_arr,_=obj2.initiate_data_transformation(train_data,test_data)
-    obj3 =Model_Trainer()
+    obj3 =Model_Trainer(max_p99_latency_ms=args.max_p99_latency_ms)
     best_score=obj3.initiate_model_trainer(train_arr,test_arr)
     print(best_score)
 
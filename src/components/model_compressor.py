@@ -0,0 +1,190 @@
+"""
+ModelCompressor Component - optional post-training step
+Purpose: Shrink artifacts/model.pkl for memory-bound serving (many model
+versions side by side) while staying within an R² tolerance on test.csv
+
+test.csv is split in two: pruning decisions are made on one half ("tune"),
+the R² in compression_report.json is measured on the other ("eval"), so the
+reported score comes from rows the pruning never saw. If the held-out drop
+still exceeds r2_tolerance, the unpruned model is written instead and the
+report says so ("outcome": "fell_back_to_unpruned").
+
+- Features are cast to float32 before predict (half the memory per row)
+- Linear model coefficients are stored as float32
+- RandomForest: keeps the smallest greedy subset of trees within tolerance
+- GradientBoosting: keeps the shortest prefix of boosting stages within tolerance
+
+sklearn trees keep thresholds / leaf values in a fixed float64 node struct
+(and already evaluate on float32 inputs), so trees are pruned, not cast.
+Run from PROJECT ROOT after training:  python -m src.components.model_compressor
+"""
+import os
+import sys
+import copy
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.compressed_model import CompressedModel
+from src.utils import load_object, save_object, save_json, measure_model_latency
+
+
+@dataclass
+class ModelCompressorConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    test_data_path: str = os.path.join("artifacts", "test.csv")
+    compressed_model_file_path: str = os.path.join("artifacts", "model_compressed.pkl")
+    compression_report_file_path: str = os.path.join("artifacts", "compression_report.json")
+    # Max R² drop that compression is allowed to cost (targeted on the tune half,
+    # enforced on the held-out half)
+    r2_tolerance: float = 0.005
+    # Share of test.csv used to make pruning decisions; the rest is held out for the report
+    tune_fraction: float = 0.5
+    random_state: int = 42
+    # Never prune an ensemble below this many trees / stages
+    min_estimators: int = 8
+
+
+def _r2_per_candidate(y, candidates):
+    """R² of every row of candidates (n_candidates, n_samples) against y"""
+    ss_tot = np.sum((y - y.mean()) ** 2)
+    ss_res = np.sum((candidates - y) ** 2, axis=1)
+    return 1.0 - ss_res / ss_tot
+
+
+class ModelCompressor:
+    def __init__(self, r2_tolerance=None):
+        self.config = ModelCompressorConfig()
+        if r2_tolerance is not None:
+            self.config.r2_tolerance = r2_tolerance
+        self.logger = logging.getLogger(__name__)
+
+    def prune_random_forest(self, model, X_tune, y_tune, target_r2):
+        """Greedy forward selection: add the tree that helps R² most until target is met"""
+        tree_preds = np.stack([tree.predict(X_tune) for tree in model.estimators_])
+        remaining = list(range(len(model.estimators_)))
+        selected = []
+        running_sum = np.zeros_like(y_tune, dtype=np.float64)
+
+        while remaining:
+            candidates = (running_sum + tree_preds[remaining]) / (len(selected) + 1)
+            scores = _r2_per_candidate(y_tune, candidates)
+            best = int(np.argmax(scores))
+            tree_idx = remaining.pop(best)
+            selected.append(tree_idx)
+            running_sum += tree_preds[tree_idx]
+            if scores[best] >= target_r2 and len(selected) >= self.config.min_estimators:
+                break
+
+        model.estimators_ = [model.estimators_[i] for i in selected]
+        model.n_estimators = len(selected)
+        return model
+
+    def prune_gradient_boosting(self, model, X_tune, y_tune, target_r2):
+        """Boosting stages are sequential - keep the shortest prefix that meets target"""
+        n_stages = model.estimators_.shape[0]
+        for n_stages, y_pred in enumerate(model.staged_predict(X_tune), start=1):
+            if n_stages >= self.config.min_estimators and r2_score(y_tune, y_pred) >= target_r2:
+                break
+
+        model.estimators_ = model.estimators_[:n_stages]
+        model.train_score_ = model.train_score_[:n_stages]
+        model.n_estimators = n_stages
+        if hasattr(model, "n_estimators_"):
+            model.n_estimators_ = n_stages
+        return model
+
+    def compress(self, model, X_tune, y_tune):
+        """Returns a CompressedModel built from a COPY of model; all pruning decisions use the tune rows only"""
+        base_r2 = r2_score(y_tune, model.predict(X_tune))
+        target_r2 = base_r2 - self.config.r2_tolerance
+        compressed = copy.deepcopy(model)
+
+        if isinstance(compressed, RandomForestRegressor):
+            compressed = self.prune_random_forest(compressed, X_tune, y_tune, target_r2)
+        elif isinstance(compressed, GradientBoostingRegressor):
+            compressed = self.prune_gradient_boosting(compressed, X_tune, y_tune, target_r2)
+        elif isinstance(compressed, LinearRegression):
+            compressed.coef_ = compressed.coef_.astype(np.float32)
+            compressed.intercept_ = np.float32(compressed.intercept_)
+
+        return CompressedModel(compressed)
+
+    def initiate_model_compression(self):
+        self.logger.info("Entered model compression component")
+        try:
+            model = load_object(self.config.trained_model_file_path)
+            preprocessor = load_object(self.config.preprocessor_obj_file_path)
+
+            test_df = pd.read_csv(self.config.test_data_path)
+            target_column_name = "math_score"
+            X_test = preprocessor.transform(test_df.drop(columns=[target_column_name]))
+            y_test = test_df[target_column_name].to_numpy(dtype=np.float64)
+            X_tune, X_eval, y_tune, y_eval = train_test_split(
+                X_test, y_test,
+                train_size=self.config.tune_fraction, random_state=self.config.random_state,
+            )
+
+            compressed = self.compress(model, np.asarray(X_tune, dtype=np.float32), y_tune)
+
+            # Held-out rows only - the pruning never saw these
+            original_r2 = float(r2_score(y_eval, model.predict(X_eval)))
+            compressed_r2 = candidate_r2 = float(r2_score(y_eval, compressed.predict(X_eval)))
+            outcome = "compressed"
+            if original_r2 - candidate_r2 > self.config.r2_tolerance:
+                self.logger.warning(
+                    f"Held-out R² drop {original_r2 - candidate_r2:.4f} exceeds tolerance "
+                    f"{self.config.r2_tolerance}; keeping the unpruned model"
+                )
+                compressed = copy.deepcopy(model)
+                compressed_r2 = original_r2
+                outcome = "fell_back_to_unpruned"
+
+            before = measure_model_latency(model, X_test)
+            after = measure_model_latency(compressed, X_test)
+            before["r2"] = original_r2
+            after["r2"] = compressed_r2
+            before["n_estimators"] = len(getattr(model, "estimators_", []))
+            after["n_estimators"] = len(getattr(getattr(compressed, "model", compressed), "estimators_", []))
+
+            reductions = {
+                key: 1.0 - after[key] / before[key]
+                for key in ("model_size_bytes", "load_time_ms", "predict_single_p99_ms", "predict_batch_ms")
+                if before[key]
+            }
+            report = {
+                "model": type(model).__name__,
+                "r2_tolerance": self.config.r2_tolerance,
+                "outcome": outcome,
+                # Held-out R² of the compressed candidate, kept or not
+                "candidate_r2": candidate_r2,
+                "r2_measured_on": f"{len(y_eval)} held-out rows of {self.config.test_data_path}",
+                "pruned_on": f"{len(y_tune)} rows of {self.config.test_data_path}",
+                "original": before,
+                "compressed": after,
+                "reduction": reductions,
+            }
+            self.logger.info(
+                f"Compressed {report['model']}: held-out R² {before['r2']:.4f} → {after['r2']:.4f}, "
+                f"size {before['model_size_bytes']} → {after['model_size_bytes']} bytes"
+            )
+
+            save_object(self.config.compressed_model_file_path, compressed)
+            save_json(self.config.compression_report_file_path, report)
+            return report
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    report = ModelCompressor().initiate_model_compression()
+    print(report["reduction"])
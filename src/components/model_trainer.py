@@ -17,18 +17,60 @@ from sklearn.tree import DecisionTreeRegressor
 from xgboost import XGBRegressor
 
 from dataclasses import dataclass
+from typing import Optional
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object,evaluate_models
+from src.utils import save_object,save_json,evaluate_models
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path=os.path.join("artifacts","model.pkl")
+    model_report_file_path: str = os.path.join("artifacts", "model_report.json")
+    # Selection policy: best CV R² among candidates whose single-row p99 predict
+    # latency stays under this limit (milliseconds). None = pure best R².
+    max_p99_latency_ms: Optional[float] = None
     
 class Model_Trainer:
-    def __init__ (self):
+    def __init__ (self, max_p99_latency_ms=None):
         self.logger = logging.getLogger(__name__)
-        self.config = ModelTrainerConfig()
+        self.config = ModelTrainerConfig(max_p99_latency_ms=max_p99_latency_ms)
+
+    def select_best_model(self, model_report):
+        """
+        Best CV R² subject to the p99 latency limit in the config.
+        Returns (model_name, score, params), or (None, None, None) if no model qualifies.
+        """
+        limit = self.config.max_p99_latency_ms
+        candidates = {
+            name: entry for name, entry in model_report.items()
+            if limit is None or entry[2]["predict_single_p99_ms"] <= limit
+        }
+        if not candidates:
+            return None, None, None
+
+        best_model_name, (best_model_score, best_params, _) = max(
+            candidates.items(), key=lambda x: x[1][0]
+        )
+        return best_model_name, best_model_score, best_params
+
+    def save_model_report(self, model_report, best_model_name):
+        """
+        Writes the per-candidate score + latency report to artifacts/ as JSON.
+        best_model_name=None (nothing met the policy) is recorded as null.
+        """
+        report = {
+            "selection_policy": {
+                "metric": "cv_r2",
+                "max_p99_latency_ms": self.config.max_p99_latency_ms,
+            },
+            "best_model": best_model_name,
+            "candidates": {
+                name: {"cv_r2": float(score), "params": params, **metrics}
+                for name, (score, params, metrics) in model_report.items()
+            },
+        }
+        save_json(self.config.model_report_file_path, report)
+
     def initiate_model_trainer(self,train_array,test_array):
         try:
             models = {
@@ -88,18 +130,22 @@ class Model_Trainer:
 
             model_report = evaluate_models(
     X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
-    models=models, params=params 
+    models=models, params=params, measure_latency=True
 )
 
             print(" Model Report:", model_report)
 
-            sorted_report = dict(sorted(model_report.items(), 
-                                    key=lambda x: x[1][0], reverse=True))
+            # Report first: when the latency limit rejects everything, the
+            # per-model latencies are exactly what's needed to pick a new limit
+            best_model_name, best_model_score, best_params = self.select_best_model(model_report)
+            self.save_model_report(model_report, best_model_name)
+            self.logger.info(f"Model report saved to {self.config.model_report_file_path}")
 
-            best_model_object = list(sorted_report.items())[0]
-            best_model_name = best_model_object[0]
-            best_model_score = best_model_object[1][0]
-            best_params = best_model_object[1][1]
+            if best_model_name is None:
+                raise ValueError(
+                    f"No model meets the p99 latency limit of {self.config.max_p99_latency_ms} ms "
+                    f"(see {self.config.model_report_file_path})"
+                )
 
             best_model = models[best_model_name].set_params(**best_params)
             best_model.fit(X_train, y_train) 
@@ -8,6 +8,16 @@ This gives EXACT file + line number of failures
 import sys
 from src.logger import logging 
 
+def _format_location(exc_tb, error):
+    file_name = exc_tb.tb_frame.f_code.co_filename  
+    line_number = exc_tb.tb_lineno        
+    
+    # FORMATTED ERROR with CONTEXT
+    return "Error occurred in python script name [{0}] line number [{1}] error message[{2}]".format(
+        file_name, line_number, str(error)
+    )
+
+
 def error_message_detail(error, error_detail: sys):
     """
     EXTRACTS PRECISE ERROR LOCATION:
@@ -17,15 +27,7 @@ def error_message_detail(error, error_detail: sys):
     """
     _, _, exc_tb = error_detail.exc_info()
     
-    file_name = exc_tb.tb_frame.f_code.co_filename  
-    line_number = exc_tb.tb_lineno        
-    
-    # FORMATTED ERROR with CONTEXT
-    error_message = "Error occurred in python script name [{0}] line number [{1}] error message[{2}]".format(
-        file_name, line_number, str(error)
-    )
-    
-    return error_message
+    return _format_location(exc_tb, error)
 
 
 class CustomException(Exception):
@@ -33,21 +35,76 @@ class CustomException(Exception):
     PRODUCTION-READY EXCEPTION:
     - Inherits from Exception (standard)
     - Auto-captures EXACT error location
+    - CHEAP on hot paths: __init__ only grabs the traceback object,
+      the "file + line" string is built the first time it's printed
+    - code: structured error for the API (HTTP status mapping lives in src/app.py)
     """
-    def __init__(self, error_message: str, error_detail: sys):
+    code = "INTERNAL_ERROR"
+
+    def __new__(cls, error_message=None, *args, **kwargs):
+        """
+        NO DOUBLE WRAPPING: wrapping an existing CustomException hands back
+        THAT exception - same type, same code, same location.
+        PredictionError(invalid_input_error, sys) is still an InvalidInputError.
+        """
+        if isinstance(error_message, CustomException):
+            return error_message
+        return super().__new__(cls, error_message, *args, **kwargs)
+
+    def __init__(self, error_message, error_detail: sys = sys):
         """
         USAGE:
         raise CustomException("Training failed", sys)
+        raise CustomException(e, sys.exc_info())   # tuple works too
         """
+        if error_message is self:
+            # __new__ returned the wrapped exception itself - it's already initialised
+            return
+
         # Pass original message to parent Exception
         super().__init__(error_message)
         
-        self.error_message = error_message_detail(error_message, error_detail=error_detail)
-    
+        self.message = str(error_message)
+        exc_info = error_detail if isinstance(error_detail, tuple) else error_detail.exc_info()
+        self._exc_tb = exc_info[2]
+        self._error_message = None
+
+    @property
+    def error_message(self):
+        """Deferred: traceback → string only happens when someone reads it"""
+        if self._error_message is None:
+            exc_tb = self._exc_tb or self.__traceback__
+            if exc_tb is None:
+                self._error_message = self.message
+            else:
+                self._error_message = _format_location(exc_tb, self.message)
+        return self._error_message
+
     def __str__(self):
         """What gets printed when exception raised"""
         return self.error_message
 
+
+# ========== TYPED ERRORS (code → HTTP status mapping in src/app.py) ==========
+class InvalidInputError(CustomException):
+    """Client sent something the model can't score (unknown category, bad number)"""
+    code = "INVALID_INPUT"
+
+
+class ArtifactError(CustomException):
+    """model.pkl / preprocessor.pkl missing or unreadable"""
+    code = "ARTIFACT_UNAVAILABLE"
+
+
+class ArtifactIntegrityError(ArtifactError):
+    """Artifact bytes don't match the checksum manifest"""
+    code = "ARTIFACT_CHECKSUM_MISMATCH"
+
+
+class PredictionError(CustomException):
+    """Model failed while scoring valid input"""
+    code = "PREDICTION_FAILED"
+
 '''
 1. EXCEPTION OCCURS ↓
    model.fit(X, y)  # ← FAILS (line 45)
@@ -58,21 +115,31 @@ class CustomException(Exception):
 
 3. __init__() RUNS AUTOMATICALLY ↓
    def __init__(self, "Training failed", sys):
-       super().__init__("Training failed")           # ← Parent Exception setup
-       self.error_message = error_message_detail(...) # ← CALLS YOUR FUNCTION
+       super().__init__("Training failed")      # ← Parent Exception setup
+       self.message = "Training failed"
+       self._exc_tb = sys.exc_info()[2]          # ← ONLY grabs the traceback object
+       self._error_message = None                # ← nothing formatted yet
 
-4. error_message_detail() EXECUTES ↓
-   def error_message_detail("Training failed", sys):
-       sys.exc_info() → "train.py", line 45
+4. FIRST READ OF .error_message (property) ↓
+   _format_location(self._exc_tb, self.message):
+       traceback → "train.py", line 45
        return "Error in [train.py] line [45] message[Training failed]"
+   result cached in self._error_message (never formatted twice,
+   never formatted at all if nobody prints / logs the traceback)
 
 5. OBJECT NOW HAS DATA ↓
    CustomException object:
-   ├── Exception.message = "Training failed"     (parent)
-   └── self.error_message = "Error in train.py line 45"  (custom)
+   ├── self.message = "Training failed"                   (always)
+   └── self.error_message = "Error in train.py line 45"   (lazy, on first read)
 
 6. RAISE/PRINT → __str__() RUNS ↓
    def __str__(self):
-       return self.error_message  # ← "Error in train.py line 45"
+       return self.error_message  # ← step 4 runs here (first time only)
+
+7. HOT PATH (serving) ↓
+   except CustomException:
+       raise                                  # ← typed error passes through untouched
+   except Exception as e:
+       raise PredictionError(e, sys)          # ← wrapped ONCE, string built lazily
 
-'''
\ No newline at end of file
+'''
@@ -0,0 +1,18 @@
+"""
+CompressedModel - the artifact written by src/components/model_compressor.py
+Lives here (never run as a script) so pickles always reference
+src.pipeline.compressed_model.CompressedModel, never __main__.
+"""
+import numpy as np
+
+
+class CompressedModel:
+    """
+    Drop-in for the trained model: PredictPipeline calls .predict() the same way.
+    Inputs are cast to float32 once, here, instead of inside every estimator.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        return self.model.predict(np.asarray(X, dtype=np.float32))
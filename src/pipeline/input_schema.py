@@ -0,0 +1,267 @@
+"""
+INPUT SCHEMA - src/pipeline/input_schema.py
+WHY: Unknown categories used to surface deep inside OneHotEncoder.transform,
+after the model was already loaded. The schema is derived from the FITTED
+preprocessor, so it knows every category seen in training and can reject a
+bad request before any inference work happens.
+
+"gender='robot'" → SchemaValidationError (no model load, no transform)
+"""
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import OneHotEncoder
+
+from src.exception import InvalidInputError
+
+# How batch scoring treats categories the encoder never saw:
+#   error         - reject the whole batch
+#   drop          - skip invalid rows (predict_batch returns the kept-row mask)
+#   ignore        - all-zero one-hot block (same as handle_unknown='ignore')
+#   most_frequent - replace with the training mode (the categorical imputer value)
+UNKNOWN_POLICIES = ("error", "drop", "ignore", "most_frequent")
+
+
+def _is_missing(value):
+    """
+    ONE rule for validate_record and encode: None / NaN (not the string "nan")
+    is MISSING and gets filled by the fitted imputer, like in training.
+    """
+    return value is None or (not isinstance(value, str) and bool(pd.isna(value)))
+
+
+class SchemaValidationError(InvalidInputError, ValueError):
+    """Raised before inference when input rows don't match the schema"""
+    def __init__(self, errors):
+        self.errors = errors
+        # No active exception to inspect - location comes from __traceback__ if ever printed
+        super().__init__("; ".join(errors), (None, None, None))
+
+
+def _check_supported_encoder(encoder, steps):
+    """
+    one_hot() rebuilds OneHotEncoder output from codes, which is only exact for
+    the plain configuration used in DataTransformation. Anything else must fail
+    loudly instead of silently feeding the model different features.
+    """
+    problems = []
+    if encoder.drop is not None:
+        problems.append(f"drop={encoder.drop!r}")
+    if encoder.handle_unknown not in ("error", "ignore"):
+        problems.append(f"handle_unknown={encoder.handle_unknown!r}")
+    if getattr(encoder, "min_frequency", None) is not None:
+        problems.append(f"min_frequency={encoder.min_frequency!r}")
+    if getattr(encoder, "max_categories", None) is not None:
+        problems.append(f"max_categories={encoder.max_categories!r}")
+    for name, step in steps.items():
+        if step is encoder:
+            continue
+        if not (isinstance(step, SimpleImputer) and step.strategy == "most_frequent"):
+            problems.append(f"extra step {name!r} ({type(step).__name__})")
+    if problems:
+        raise ValueError(
+            "InputSchema only supports a plain OneHotEncoder (optionally after a "
+            "most_frequent SimpleImputer); unsupported: " + ", ".join(problems)
+        )
+
+
+class InputSchema:
+    def __init__(self, numeric_columns, numeric_pipeline, categorical_columns, categories, fill_values, blocks):
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_pipeline = numeric_pipeline
+        self.categorical_columns = list(categorical_columns)
+        self.categories = {col: list(cats) for col, cats in zip(self.categorical_columns, categories)}
+        self.columns = self.numeric_columns + self.categorical_columns
+        self.blocks = blocks  # output order of the ColumnTransformer: "num" / "cat"
+
+        # Precomputed lookup tables: category → integer code, per column
+        self.lookup = {
+            col: {cat: code for code, cat in enumerate(cats)}
+            for col, cats in self.categories.items()
+        }
+        # Code used for missing values (what the fitted most_frequent imputer would fill)
+        self.fill_codes = {
+            col: self.lookup[col][fill]
+            for col, fill in zip(self.categorical_columns, fill_values)
+        }
+        # Start column of every categorical block inside the one-hot matrix
+        sizes = [len(self.categories[col]) for col in self.categorical_columns]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        self.n_one_hot = int(sum(sizes))
+        self.n_features_out = len(self.numeric_columns) + self.n_one_hot
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+        """
+        Reads columns + categories from the fitted ColumnTransformer built in
+        DataTransformation (numeric pipeline + imputer/one_hot_encoder pipeline).
+        Raises ValueError for configurations one_hot() can't reproduce exactly.
+        """
+        if getattr(preprocessor, "sparse_output_", False):
+            raise ValueError("InputSchema only supports a preprocessor with dense output")
+
+        numeric_columns, numeric_pipeline = [], None
+        categorical_columns, categories, fill_values = [], [], []
+        blocks = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder":
+                if transformer != "drop":
+                    raise ValueError(f"InputSchema only supports remainder='drop', got {transformer!r}")
+                continue
+            steps = dict(getattr(transformer, "named_steps", {}))
+            encoder = next((s for s in steps.values() if isinstance(s, OneHotEncoder)), None)
+            if encoder is None:
+                numeric_columns, numeric_pipeline = list(columns), transformer
+                blocks.append("num")
+            else:
+                _check_supported_encoder(encoder, steps)
+                categorical_columns = list(columns)
+                categories = encoder.categories_
+                imputer = steps.get("imputer")
+                fill_values = (
+                    list(imputer.statistics_) if imputer is not None
+                    else [cats[0] for cats in categories]
+                )
+                blocks.append("cat")
+
+        schema = cls(numeric_columns, numeric_pipeline, categorical_columns, categories, fill_values, blocks)
+
+        # Numeric block must be one output column per input column
+        n_expected = len(preprocessor.get_feature_names_out())
+        if schema.n_features_out != n_expected:
+            raise ValueError(
+                f"InputSchema would produce {schema.n_features_out} features, preprocessor produces {n_expected}"
+            )
+        schema.check_against(preprocessor)
+        return schema
+
+    def sample_frame(self):
+        """
+        Small probe covering every known category once, plus a row of
+        missing values (exercises both imputers)
+        """
+        n_rows = max([len(cats) for cats in self.categories.values()] + [1])
+        sample = {
+            col: [cats[i % len(cats)] for i in range(n_rows)] + [np.nan]
+            for col, cats in self.categories.items()
+        }
+        for k, col in enumerate(self.numeric_columns):
+            sample[col] = [float(i * (k + 1)) for i in range(n_rows)] + [np.nan]
+        return pd.DataFrame(sample, columns=self.columns)
+
+    def check_against(self, preprocessor):
+        """Guards the hand-built one-hot path: must equal preprocessor.transform on the probe"""
+        sample = self.sample_frame()
+        expected = preprocessor.transform(sample)
+        try:
+            actual, _ = self.transform(sample)
+        except Exception as e:
+            raise ValueError(f"InputSchema.transform failed on the probe sample: {e}")
+        if expected.shape != actual.shape or not np.allclose(expected, actual):
+            raise ValueError("InputSchema.transform does not match preprocessor.transform on the probe sample")
+
+    def validate_record(self, record):
+        """
+        Cheap check of ONE request (dict column → value), no DataFrame involved.
+        Same rules as encode(): missing values pass (imputed), unknown
+        categories and non-finite / non-numeric numbers don't.
+        Raises SchemaValidationError listing every bad field.
+        """
+        errors = []
+        for col in self.categorical_columns:
+            value = record.get(col)
+            if not _is_missing(value) and value not in self.lookup[col]:
+                errors.append(f"{col}: unknown category {value!r}")
+        for col in self.numeric_columns:
+            value = record.get(col)
+            if _is_missing(value):
+                continue
+            try:
+                if not np.isfinite(float(value)):
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append(f"{col}: expected a number, got {value!r}")
+        if errors:
+            raise SchemaValidationError(errors)
+
+    def encode(self, features, unknown_policy="error"):
+        """
+        Categorical columns → int codes, shape (n_rows, n_categorical).
+        Unknown categories become -1 (or the fill code under 'most_frequent').
+        Returns (codes, valid_row_mask).
+        """
+        if unknown_policy not in UNKNOWN_POLICIES:
+            raise ValueError(f"unknown_policy must be one of {UNKNOWN_POLICIES}, got {unknown_policy!r}")
+
+        missing = [col for col in self.columns if col not in features.columns]
+        if missing:
+            raise SchemaValidationError([f"missing column {col}" for col in missing])
+
+        n_rows = len(features)
+        codes = np.empty((n_rows, len(self.categorical_columns)), dtype=np.intp)
+        valid = np.ones(n_rows, dtype=bool)
+        errors = []
+
+        for j, col in enumerate(self.categorical_columns):
+            values = features[col]
+            mapped = values.map(self.lookup[col])
+            is_missing = values.isna().to_numpy()
+            is_unknown = mapped.isna().to_numpy() & ~is_missing
+
+            column_codes = mapped.fillna(-1).to_numpy(dtype=np.intp, copy=True)
+            column_codes[is_missing] = self.fill_codes[col]
+            if unknown_policy == "most_frequent":
+                column_codes[is_unknown] = self.fill_codes[col]
+            elif unknown_policy in ("error", "drop") and is_unknown.any():
+                valid &= ~is_unknown
+                errors.extend(
+                    f"row {i}: {col}: unknown category {values.iloc[i]!r}"
+                    for i in np.flatnonzero(is_unknown)
+                )
+            codes[:, j] = column_codes
+
+        for col in self.numeric_columns:
+            values = features[col]
+            numeric = pd.to_numeric(values, errors="coerce")
+            is_bad = (numeric.isna() & values.notna()).to_numpy() | np.isinf(numeric.to_numpy(dtype=float))
+            if is_bad.any():
+                valid &= ~is_bad
+                errors.extend(
+                    f"row {i}: {col}: expected a number, got {values.iloc[i]!r}"
+                    for i in np.flatnonzero(is_bad)
+                )
+
+        if errors and unknown_policy != "drop":
+            raise SchemaValidationError(errors)
+
+        return codes, valid
+
+    def one_hot(self, codes):
+        """Int codes → the one-hot block OneHotEncoder would produce (code -1 = all zeros)"""
+        n_rows = codes.shape[0]
+        out = np.zeros((n_rows, self.n_one_hot), dtype=np.float64)
+        rows = np.arange(n_rows)
+        for j in range(codes.shape[1]):
+            known = codes[:, j] >= 0
+            out[rows[known], self.offsets[j] + codes[known, j]] = 1.0
+        return out
+
+    def transform(self, features, unknown_policy="error"):
+        """
+        Drop-in for preprocessor.transform(features) with validation up front.
+        Returns (X, valid_row_mask); X only holds the valid rows.
+        """
+        codes, valid = self.encode(features, unknown_policy)
+        if not valid.any():
+            # Every row dropped - nothing for the fitted transformers to see
+            return np.empty((0, self.n_features_out)), valid
+        if not valid.all():
+            features, codes = features[valid], codes[valid]
+
+        numeric = features[self.numeric_columns].apply(pd.to_numeric)
+        parts = {
+            "num": self.numeric_pipeline.transform(numeric),
+            "cat": self.one_hot(codes),
+        }
+        return np.hstack([parts[block] for block in self.blocks]), valid
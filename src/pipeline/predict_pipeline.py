@@ -1,8 +1,10 @@
 import sys
 import os 
-from src.exception import CustomException
-from src.utils import load_object 
+from src.exception import CustomException, ArtifactError, PredictionError
+from src.utils import load_object, MANIFEST_FILE_NAME
 from src.logger import logging
+from src.pipeline.input_schema import InputSchema
+import numpy as np
 import pandas as pd
 
 class CustomData:
@@ -44,27 +46,106 @@ class CustomData:
 
         except Exception as e:
             raise CustomException(e, sys) 
+
+    def get_data_as_dict(self):
+        """Single-row record for InputSchema.validate_record (no DataFrame needed)"""
+        return {
+            "gender": self.gender,
+            "race_ethnicity": self.race_ethnicity,
+            "parental_level_of_education": self.parental_level_of_education,
+            "lunch": self.lunch,
+            "test_preparation_course": self.test_preparation_course,
+            "reading_score": self.reading_score,
+            "writing_score": self.writing_score,
+        }
         
     
 class PredictPipeline:
-    def __init__(self):
+    def __init__(self, model_path=None):
+          """model_path: e.g. artifacts/model_compressed.pkl from ModelCompressor (default artifacts/model.pkl)"""
           self.logger = logging.getLogger(__name__)
+          self.model_path=model_path or os.path.join("artifacts","model.pkl")
+          self.preprocessor_path=os.path.join('artifacts','preprocessor.pkl')
+          # file path → {"signature", "obj", "failed", "error"} (see get_artifact)
+          self.artifacts={}
+
+    @staticmethod
+    def artifact_signature(file_path):
+        """Changes whenever save_object replaces the file (atomic rename → new inode)"""
+        stat=os.stat(file_path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def get_artifact(self, file_path, build=None):
+        """
+        Cached object for file_path, reloaded only when the file is replaced.
+        Runs on the request path, so:
+        - no retry sleeps inside load_object
+        - a failed reload is remembered per (file, manifest) version and not
+          retried until one of them changes (e.g. the save finishes)
+        - if a reload fails, the last good object keeps serving
+        """
+        entry=self.artifacts.setdefault(file_path, {"signature": None, "obj": None, "failed": None, "error": None})
+        manifest_path=os.path.join(os.path.dirname(file_path) or ".", MANIFEST_FILE_NAME)
+        try:
+            signature=self.artifact_signature(file_path)
+        except OSError as e:
+            if entry["obj"] is not None:
+                self.logger.warning("%s unavailable (%s), serving the cached version", file_path, e)
+                return entry["obj"]
+            raise ArtifactError(e,sys)
+        if signature==entry["signature"]:
+            return entry["obj"]
+
+        try:
+            failed_key=(signature, self.artifact_signature(manifest_path))
+        except OSError:
+            failed_key=(signature, None)
+        if failed_key!=entry["failed"]:
+            try:
+                obj=load_object(file_path, retry_delays=())
+                if build is not None:
+                    obj=build(obj)
+            except Exception as e:
+                entry["failed"], entry["error"]=failed_key, ArtifactError(e,sys)
+                self.logger.warning("Reloading %s failed: %s", file_path, entry["error"].message)
+            else:
+                entry.update(signature=signature, obj=obj, failed=None, error=None)
+                return obj
 
+        if entry["obj"] is not None:
+            return entry["obj"]
+        # Fresh instance each time - re-raising one object would keep growing its traceback
+        raise type(entry["error"])(entry["error"].message, (None, None, None))
+
+    def get_schema(self):
+        """Request schema derived from the fitted preprocessor's known categories"""
+        return self.get_artifact(self.preprocessor_path, build=InputSchema.from_preprocessor)
+
+    def get_model(self):
+        return self.get_artifact(self.model_path)
 
     def predict(self,features):
+        """Single request / strict batch: any invalid row raises SchemaValidationError"""
+        preds, _ = self.predict_batch(features, unknown_policy="error")
+        return preds
+
+    def predict_batch(self, features, unknown_policy="error"):
+        """
+        Batch scoring. Rows are validated + encoded BEFORE the model is loaded.
+        Returns (preds, row_mask) - row_mask marks which input rows were scored
+        (all True unless unknown_policy="drop" skipped some).
+        """
         try:
-            model_path=os.path.join("artifacts","model.pkl")
-            preprocessor_path=os.path.join('artifacts','preprocessor.pkl')
-            print("Before Loading")
-            model=load_object(file_path=model_path)
-            preprocessor=load_object(file_path=preprocessor_path)
-            print("After Loading")
-            data_scaled=preprocessor.transform(features)
+            schema=self.get_schema()
+            data_scaled, row_mask=schema.transform(features, unknown_policy=unknown_policy)
+            if not len(data_scaled):
+                return np.empty(0), row_mask
+            model=self.get_model()
             preds=model.predict(data_scaled)
             self.logger.info("Predicted output recevied from the custom inputs ")
-            return preds
-        
-        except Exception as e:
-            raise CustomException(e,sys)
+            return preds, row_mask
 
-        
\ No newline at end of file
+        except CustomException:
+            raise  # already typed (invalid input / missing artifact) - don't re-wrap
+        except Exception as e:
+            raise PredictionError(e,sys)
@@ -1,28 +1,294 @@
 import os
 import sys
+import stat
+import time
+import json
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np 
 import pandas as pd
 import dill
 import pickle
 from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import GridSearchCV, cross_val_score
+
+from src.exception import CustomException, ArtifactError, ArtifactIntegrityError
+
+try:
+    import fcntl  # POSIX: lets separate processes (trainer + compressor) share the manifest
+except ImportError:
+    fcntl = None
+
+# ========== ARTIFACT WRITES ==========
+# Every artifact is written to a temp file in the SAME directory, fsynced and
+# then os.replace()d over the target, so a reader (e.g. the serving process)
+# only ever sees the old file or the new file - never a half-written one.
+# The SHA-256 of every artifact is recorded in <dir>/manifest.json.
+#
+# Write protocol (so a reader never sees file + manifest disagree):
+#   1. manifest: keep the current checksum, announce the new one as "pending"
+#   2. os.replace() the new bytes over the artifact
+#   3. manifest: pending becomes the only accepted checksum
+# A reader reads the file FIRST, then the manifest: the file it holds is
+# always accepted by any manifest version written after it.
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_LOCK_FILE_NAME = ".manifest.lock"
+
+# Loader retries (seconds) for the rare read that straddles steps 2 and 3.
+# Offline callers only - the serving path passes retry_delays=() (see PredictPipeline)
+LOAD_RETRY_DELAYS = (0.01, 0.02, 0.05, 0.1, 0.2)
+
+# mkstemp creates 0600 files; new artifacts get what open(path, "wb") would give
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {}  # manifest path -> ((st_ino, st_size, st_mtime_ns), entries)
+
+
+def _reset_manifest_lock():
+    # A fork while another thread holds the lock would leave the child stuck forever
+    global _manifest_lock
+    _manifest_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_manifest_lock)
+
+# Single worker keeps background writes to the same file in submission order
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+_pending_writes = []
+
+
+def _atomic_write_bytes(file_path, data):
+    dir_path = os.path.dirname(file_path) or "."
+    os.makedirs(dir_path, exist_ok=True)
 
-from src.exception import CustomException
-def save_object(file_path, obj):
     try:
-        dir_path = os.path.dirname(file_path)
+        # Replacing keeps the target's mode, so a serving process under another user can still read it
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
 
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-", suffix=os.path.basename(file_path))
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, mode)
+        else:
+            os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "wb") as file_obj:
+            file_obj.write(data)
+            file_obj.flush()
+            os.fsync(file_obj.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself (POSIX only; directories can't be opened on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _read_manifest(manifest_path, use_cache=True):
+    """
+    Manifest entries, re-parsed only when the file changes.
+    Every save replaces the manifest (new inode), so inode + size + mtime
+    catches changes even where mtime alone is too coarse.
+    """
+    try:
+        manifest_stat = os.stat(manifest_path)
+    except FileNotFoundError:
+        return {}
+    key = (manifest_stat.st_ino, manifest_stat.st_size, manifest_stat.st_mtime_ns)
+
+    cached = _manifest_cache.get(manifest_path)
+    if use_cache and cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(manifest_path, "r") as file_obj:
+        entries = json.load(file_obj)
+    _manifest_cache[manifest_path] = (key, entries)
+    return entries
+
+
+@contextmanager
+def _locked_manifest(dir_path):
+    """Thread lock + (on POSIX) an flock shared with other processes writing to dir_path"""
+    with _manifest_lock:
+        if fcntl is None:
+            yield
+            return
         os.makedirs(dir_path, exist_ok=True)
+        with open(os.path.join(dir_path, MANIFEST_LOCK_FILE_NAME), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _write_manifest(manifest_path, entries):
+    _atomic_write_bytes(manifest_path, json.dumps(entries, indent=4, sort_keys=True).encode("utf-8"))
+    _manifest_cache.pop(manifest_path, None)
+
+
+def _write_artifact(file_path, data):
+    """Atomic write + manifest update (see protocol above). Runs on the caller or the writer thread."""
+    dir_path = os.path.dirname(file_path) or "."
+    manifest_path = os.path.join(dir_path, MANIFEST_FILE_NAME)
+    name = os.path.basename(file_path)
+    checksum = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+    with _locked_manifest(dir_path):
+        # Always re-read under the lock: another process may have added entries
+        entries = dict(_read_manifest(manifest_path, use_cache=False))
+        entries[name] = {**entries.get(name, {}), "pending": checksum}
+        _write_manifest(manifest_path, entries)
+
+        _atomic_write_bytes(file_path, data)
+
+        entries[name] = checksum
+        _write_manifest(manifest_path, entries)
+
+
+def _submit_write(file_path, data, background):
+    if not background:
+        _write_artifact(file_path, data)
+        return None
+
+    future = _write_executor.submit(_write_artifact, file_path, data)
+    _pending_writes.append(future)
+    return future
+
+
+def wait_for_pending_writes():
+    """Blocks until every background write has landed; re-raises the first failure"""
+    try:
+        while _pending_writes:
+            _pending_writes.pop(0).result()
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def save_object(file_path, obj, background=False):
+    """
+    Pickles obj and writes it atomically.
+    background=True serializes now (so later mutations of obj can't leak in)
+    but hands the disk I/O to the writer thread and returns its Future.
+    """
+    try:
+        data = pickle.dumps(obj)
+        return _submit_write(file_path, data, background)
+
+    except Exception as e:
+        raise CustomException(e, sys)
 
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+
+def save_dataframe(file_path, df, background=False):
+    """Same guarantees as save_object, for CSV artifacts"""
+    try:
+        data = df.to_csv(index=False, header=True).encode("utf-8")
+        return _submit_write(file_path, data, background)
 
     except Exception as e:
         raise CustomException(e, sys)
 
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, params):
+def save_json(file_path, obj):
+    try:
+        data = json.dumps(obj, indent=4, default=str).encode("utf-8")
+        return _submit_write(file_path, data, background=False)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def verify_checksum(file_path, data):
+    """
+    Compares data against the manifest entry for file_path: the committed
+    checksum, or the pending one while a save is in flight.
+    Artifacts without a committed checksum (written before manifests existed) pass.
+    """
+    manifest_path = os.path.join(os.path.dirname(file_path) or ".", MANIFEST_FILE_NAME)
+    entry = _read_manifest(manifest_path).get(os.path.basename(file_path))
+    if entry is None or "sha256" not in entry:
+        return True
+
+    accepted = [entry] + ([entry["pending"]] if "pending" in entry else [])
+    # Size check first: catches truncation without hashing
+    accepted = [c for c in accepted if c["size"] == len(data)]
+    if not accepted:
+        return False
+    digest = hashlib.sha256(data).hexdigest()
+    return any(c["sha256"] == digest for c in accepted)
+
+
+def measure_model_latency(model, X_test, n_single=200, n_batch=10, n_load=10):
+    """
+    PRODUCTION COST OF ONE FITTED MODEL:
+    - Single-row predict latency (p50 / p99, milliseconds)
+    - Full-batch predict latency (milliseconds, per batch and per row)
+    - Pickled size on disk (bytes) and median unpickle time (milliseconds)
+    """
+    try:
+        single_row = X_test[:1]
+        model.predict(single_row)  # warm-up, keeps lazy init out of the timings
+
+        single_times = []
+        for _ in range(n_single):
+            start = time.perf_counter()
+            model.predict(single_row)
+            single_times.append(time.perf_counter() - start)
+
+        batch_times = []
+        for _ in range(n_batch):
+            start = time.perf_counter()
+            model.predict(X_test)
+            batch_times.append(time.perf_counter() - start)
+
+        payload = pickle.dumps(model)
+        load_times = []
+        for _ in range(n_load):
+            start = time.perf_counter()
+            pickle.loads(payload)
+            load_times.append(time.perf_counter() - start)
+
+        single_ms = np.array(single_times) * 1000.0
+        batch_ms = float(np.median(batch_times) * 1000.0)
+
+        return {
+            "predict_single_p50_ms": float(np.percentile(single_ms, 50)),
+            "predict_single_p99_ms": float(np.percentile(single_ms, 99)),
+            "predict_batch_ms": batch_ms,
+            "predict_batch_per_row_ms": batch_ms / max(len(X_test), 1),
+            "model_size_bytes": len(payload),
+            "load_time_ms": float(np.median(load_times) * 1000.0),
+        }
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def evaluate_models(X_train, y_train, X_test, y_test, models, params, measure_latency=False):
+    """
+    Returns {model_name: (cv_r2, params)}.
+    The score is always 3-fold CV R² on the TRAIN set (GridSearchCV best score,
+    or cross_val_score for models without a grid), so candidates are comparable
+    and the test set stays out of model selection.
+    measure_latency=True only adds a third element, metrics: test_r2 (for
+    reporting), fit_time_s plus everything from measure_model_latency().
+    """
     try:
         report = {}
         
@@ -33,23 +299,51 @@ def evaluate_models(X_train, y_train, X_test, y_test, models, params):
                 para = params[model_name]
                 gs = GridSearchCV(model, para, cv=3)
                 gs.fit(X_train, y_train)
-                report[model_name] = (gs.best_score_, gs.best_params_)
+                score, best_params = gs.best_score_, gs.best_params_
+                fitted_model, fit_time = gs.best_estimator_, gs.refit_time_
             else:
                 
+                score = cross_val_score(model, X_train, y_train, cv=3, scoring="r2").mean()
+                start = time.perf_counter()
                 model.fit(X_train, y_train)
-                y_test_pred = model.predict(X_test)
-                test_r2 = r2_score(y_test, y_test_pred)
-                report[model_name] = (test_r2, {})
+                fit_time = time.perf_counter() - start
+                best_params, fitted_model = {}, model
+
+            if measure_latency:
+                test_r2 = r2_score(y_test, fitted_model.predict(X_test))
+                metrics = {"test_r2": float(test_r2), "fit_time_s": fit_time}
+                metrics.update(measure_model_latency(fitted_model, X_test))
+                report[model_name] = (score, best_params, metrics)
+            else:
+                report[model_name] = (score, best_params)
         
         return report
         
+    except CustomException:
+        raise
     except Exception as e:
         raise CustomException(e, sys.exc_info()) 
 
-def load_object(file_path):
+def load_object(file_path, retry_delays=LOAD_RETRY_DELAYS):
+    """
+    Reads + checksum-verifies + unpickles an artifact.
+    retry_delays: sleeps between re-reads on a checksum mismatch; pass () where
+    sleeping is not acceptable (request handlers).
+    """
     try:
-        with open(file_path, "rb") as file_obj:
-            return pickle.load(file_obj)
+        # File first, manifest second (see write protocol). A concurrent save can
+        # still finish both manifest updates between the two reads - back off and retry
+        for delay in tuple(retry_delays) + (None,):
+            with open(file_path, "rb") as file_obj:
+                data = file_obj.read()
+            if verify_checksum(file_path, data):
+                return pickle.loads(data)
+            if delay is not None:
+                time.sleep(delay)
 
+        raise ArtifactIntegrityError(f"Checksum mismatch for artifact {file_path}", (None, None, None))
+
+    except CustomException:
+        raise
     except Exception as e:
-        raise CustomException(e, sys)
+        raise ArtifactError(e, sys)